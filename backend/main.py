@@ -1,18 +1,66 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
+from fastapi import FastAPI, HTTPException, File, Query, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from fastapi.staticfiles import StaticFiles
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Dict, Any, Optional, Set, Tuple
+import asyncio
+import base64
+import hashlib
+import heapq
 import json
+import multiprocessing
+import operator
 import os
+import re
 import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 from datetime import datetime
+from pathlib import Path
 import logging
 
+try:
+    import orjson
+except ImportError:  # orjsonが利用できない環境では標準ライブラリのjsonを使用
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # ijsonが利用できない環境ではファイル全体を読み込む
+    ijson = None
+
 # ログ設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# JSONの解析・バリデーションを実行するプロセス数。環境変数 PROCESS_POOL_WORKERS で変更可能
+PROCESS_POOL_WORKERS = int(os.environ.get("PROCESS_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+
+# JSONの解析・バリデーションを実行するプロセスプール（起動時に作成）
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    起動時にプロセスプールを作成し、終了時に停止する
+    スレッドを使用しているサーバープロセスをforkしないよう、forkserver（なければspawn）で子プロセスを起動する
+    """
+    global _PROCESS_POOL
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    _PROCESS_POOL = ProcessPoolExecutor(
+        max_workers=PROCESS_POOL_WORKERS,
+        mp_context=multiprocessing.get_context(start_method),
+    )
+    try:
+        yield
+    finally:
+        _PROCESS_POOL.shutdown()
+        _PROCESS_POOL = None
+
 # FastAPIアプリケーションの初期化
 app = FastAPI(
     title="Storybook API",
@@ -20,9 +68,46 @@ app = FastAPI(
     version="1.0.0",
     docs_url=None, 
     redoc_url=None, 
-    openapi_url=None
+    openapi_url=None,
+    lifespan=lifespan
 )
 
+# リクエストボディサイズの上限（バイト）。環境変数 MAX_UPLOAD_BYTES で変更可能
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", 50 * 1024 * 1024))
+
+class LimitRequestSizeMiddleware:
+    """
+    ボディの読み込み・解析の前に、Content-Lengthでリクエストボディサイズを制限する
+    レスポンスには関与しないため、ヘッダーのみを参照するASGIミドルウェアとして実装する
+    """
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            content_length = next((value for name, value in scope["headers"] if name == b"content-length"), None)
+            # bytes.isdigit()はASCIIの数字のみを受け付ける
+            if content_length is not None and not content_length.isdigit():
+                response = JSONResponse(
+                    status_code=400,
+                    content={"detail": "Content-Lengthが不正です"}
+                )
+                await response(scope, receive, send)
+                return
+            if content_length is not None and int(content_length) > self.max_bytes:
+                response = JSONResponse(
+                    status_code=413,
+                    content={"detail": f"リクエストサイズが上限（{self.max_bytes}バイト）を超えています"}
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+# リクエストボディサイズの制限
+# CORSヘッダーが付与されるよう、CORS設定より先に登録する
+app.add_middleware(LimitRequestSizeMiddleware, max_bytes=MAX_UPLOAD_BYTES)
+
 # CORS設定
 app.add_middleware(
     CORSMiddleware,
@@ -32,11 +117,253 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 画像・音声ファイルの配信パス
+ASSET_URL_PREFIX = "/api/asset"
+
+class SelectiveGZipMiddleware:
+    """
+    指定されたパス以下を除いてレスポンスをgzip圧縮する
+    画像・音声ファイルは圧縮済みの形式のため、再圧縮しない
+    """
+    def __init__(self, app, exclude_prefixes: Tuple[str, ...], **options):
+        self.app = app
+        self.gzip_app = GZipMiddleware(app, **options)
+        self.exclude_prefixes = exclude_prefixes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip_app(scope, receive, send)
+
+# レスポンスのgzip圧縮（Base64を含む絵本データはサイズが大きいため）
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    exclude_prefixes=(ASSET_URL_PREFIX + "/",),
+    minimum_size=1024,
+    compresslevel=5,
+)
+
 # データディレクトリのパス
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DATA_DIR = Path(__file__).parent / "data"
+
+# ページの画像・音声ファイルの保存ディレクトリのパス
+PAGES_DIR = DATA_DIR / "pages"
+
+# 内容のSHA-256で名前を付けた画像・音声ファイルの保存ディレクトリのパス（同じ内容は1つだけ保存）
+ASSET_HASH_DIR = PAGES_DIR / "sha256"
 
 # データディレクトリが存在しない場合は作成
-os.makedirs(DATA_DIR, exist_ok=True)
+ASSET_HASH_DIR.mkdir(parents=True, exist_ok=True)
+
+# パスのセキュリティチェック用に、データディレクトリの実パスを起動時に求めておく
+_REAL_DATA_DIR = str(DATA_DIR.resolve())
+
+# 画像・音声ファイルの配信
+app.mount(ASSET_URL_PREFIX, StaticFiles(directory=PAGES_DIR), name="asset")
+
+def dumps_json(data: Any, indent: bool = True) -> bytes:
+    """
+    データをUTF-8 JSONバイト列に変換する
+    indent=Falseの場合は改行を含まない1行のJSONにする
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if indent:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def loads_json(raw: bytes) -> Any:
+    """
+    JSONバイト列をPythonオブジェクトに変換する
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def write_bytes_atomic(path: Path, payload: bytes) -> None:
+    """
+    一時ファイルに1回で書き込んでから置き換えることで、書き込み途中のファイルが読まれないようにする
+    """
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+# JSON Lines形式の保存ファイルの1行目（ヘッダー行）の識別子
+# 1行目に {"format": ..., "metadata": {...}}、2行目以降に1ページずつ保存する
+JSONL_FORMAT = 'storybook-jsonl'
+JSONL_PREFIX = b'{"format":"storybook-jsonl"'
+
+def dumps_storybook_jsonl(metadata: Dict[str, Any], pages: List[Dict[str, Any]]) -> bytes:
+    """
+    絵本データをJSON Lines形式のバイト列に変換する
+    """
+    lines = [dumps_json({"format": JSONL_FORMAT, "metadata": metadata}, indent=False)]
+    lines.extend(dumps_json(page, indent=False) for page in pages)
+    return b'\n'.join(lines) + b'\n'
+
+def is_jsonl_storybook(raw: bytes) -> bool:
+    """
+    保存ファイルがJSON Lines形式かどうかを先頭のバイト列で判定する
+    """
+    return raw.startswith(JSONL_PREFIX)
+
+def loads_storybook(raw: bytes) -> Any:
+    """
+    保存ファイルを読み込み、{"metadata": ..., "pages": [...]} の形式で返す
+    JSON Lines形式と旧形式（1つのJSON）の両方に対応する
+    """
+    if not is_jsonl_storybook(raw):
+        return loads_json(raw)
+    
+    header, _, body = raw.partition(b'\n')
+    pages = [loads_json(line) for line in body.splitlines() if line.strip()]
+    return {"metadata": loads_json(header).get('metadata'), "pages": pages}
+
+# ファイル名に使用できない文字（英数字・空白・ハイフン・アンダースコア以外）
+TITLE_EXCLUDE_RE = re.compile(r'[^\w\- ]+')
+
+# 取得APIで受け付けるファイル名（英数字・空白・ハイフン・アンダースコアのみ、拡張子.jsonは省略可）
+FILENAME_RE = re.compile(r'[\w\- ]{1,255}(?:\.json)?')
+
+# 一覧表示用のサイドカーファイル（メタデータとページ1の画像のみを保持）の拡張子
+SIDECAR_SUFFIX = '.meta.json'
+
+def is_storybook_file(filename: str) -> bool:
+    """
+    絵本本体のJSONファイルかどうかを判定する（サイドカーファイルは除外）
+    取得APIで受け付けないファイル名（ドットを含むものなど）は一覧にも含めない
+    """
+    return (
+        filename.endswith('.json')
+        and not filename.endswith(SIDECAR_SUFFIX)
+        and FILENAME_RE.fullmatch(filename) is not None
+    )
+
+def get_sidecar_path(file_path: Path) -> Path:
+    """
+    絵本ファイルに対応するサイドカーファイルのパスを返す
+    """
+    return file_path.with_name(file_path.name[:-len('.json')] + SIDECAR_SUFFIX)
+
+def write_sidecar(file_path: Path, metadata: Dict[str, Any], page1_image: Optional[str], file_size: Optional[int] = None) -> None:
+    """
+    絵本ファイルに対応するサイドカーファイルを書き込む
+    file_sizeには画像・音声ファイルを含めた絵本のサイズを指定する（旧形式のファイルでは省略）
+    """
+    sidecar = {"metadata": metadata, "page1_imageBase64": page1_image, "fileSize": file_size}
+    write_bytes_atomic(get_sidecar_path(file_path), dumps_json(sidecar))
+
+# ページ内のBase64フィールドと、書き出したファイルの参照フィールドの対応
+ASSET_FIELDS = (('imageBase64', 'imagePath'), ('audioBase64', 'audioPath'))
+
+def decode_base64_exact(value: Any) -> Optional[bytes]:
+    """
+    Base64文字列をデコードする
+    再エンコードで元の文字列に戻らない値（data URLなど）はNoneを返す
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        raw = base64.b64decode(value, validate=True)
+    except ValueError:
+        return None
+    if base64.b64encode(raw).decode('ascii') != value:
+        return None
+    return raw
+
+def guess_asset_extension(raw: bytes) -> str:
+    """
+    ファイル先頭のバイト列から拡張子を推定する
+    """
+    if raw.startswith(b'\x89PNG'):
+        return '.png'
+    if raw.startswith(b'\xff\xd8'):
+        return '.jpg'
+    if raw.startswith(b'GIF8'):
+        return '.gif'
+    if raw[:4] == b'RIFF' and raw[8:12] == b'WEBP':
+        return '.webp'
+    if raw[:4] == b'RIFF' and raw[8:12] == b'WAVE':
+        return '.wav'
+    if raw.startswith(b'OggS'):
+        return '.ogg'
+    if raw.startswith(b'ID3') or raw[:2] in (b'\xff\xfb', b'\xff\xf3', b'\xff\xf2'):
+        return '.mp3'
+    return '.bin'
+
+def export_page_assets(page: "PageData") -> Tuple[Dict[str, Any], int]:
+    """
+    ページの画像・音声をバイナリファイルとして書き出し、(パス参照に置き換えたページの辞書, 画像・音声のバイト数)を返す
+    ファイル名は内容のSHA-256とし、同じ内容のファイルが既にあれば書き込まない
+    書き出したBase64文字列は辞書に含めない
+    パスはPAGES_DIRからの相対パスとする
+    """
+    asset_paths = {}
+    asset_size = 0
+    for base64_field, path_field in ASSET_FIELDS:
+        raw = decode_base64_exact(getattr(page, base64_field))
+        if raw is None:
+            # 空文字やBase64として扱えない値はそのままJSONに残す
+            continue
+        
+        name = f"{hashlib.sha256(raw).hexdigest()}{guess_asset_extension(raw)}"
+        asset_file_path = ASSET_HASH_DIR / name
+        if not asset_file_path.exists():
+            write_bytes_atomic(asset_file_path, raw)
+        
+        asset_paths[base64_field] = (path_field, f"sha256/{name}")
+        asset_size += len(raw)
+    
+    page_data = page.model_dump(exclude=set(asset_paths))
+    for path_field, asset_path in asset_paths.values():
+        page_data[path_field] = asset_path
+    return page_data, asset_size
+
+def read_asset_base64(asset_path: str) -> str:
+    """
+    書き出したファイルを読み込み、Base64文字列として返す
+    """
+    return base64.b64encode((PAGES_DIR / asset_path).read_bytes()).decode('ascii')
+
+def get_page_image(page: Dict[str, Any]) -> Optional[str]:
+    """
+    ページの画像をBase64文字列で返す（ファイルに書き出されている場合は読み込む）
+    """
+    if page.get('imagePath') is not None:
+        return read_asset_base64(page['imagePath'])
+    return page.get('imageBase64')
+
+def inline_page_assets(page: Any, base64_fields: Optional[Set[str]] = None) -> Any:
+    """
+    パス参照になっている画像・音声をBase64文字列に戻したページを返す
+    base64_fieldsを指定した場合は、そのフィールドのみを戻す
+    """
+    if not isinstance(page, dict):
+        return page
+    page = dict(page)
+    for base64_field, path_field in ASSET_FIELDS:
+        if base64_fields is not None and base64_field not in base64_fields:
+            continue
+        asset_path = page.pop(path_field, None)
+        if asset_path is not None:
+            page[base64_field] = read_asset_base64(asset_path)
+    return page
+
+def inline_storybook_assets(data: Any, base64_fields: Optional[Set[str]] = None) -> None:
+    """
+    絵本データの全ページについて、パス参照になっている画像・音声をBase64文字列に戻す
+    """
+    if isinstance(data, dict) and isinstance(data.get('pages'), list):
+        data['pages'] = [inline_page_assets(page, base64_fields) for page in data['pages']]
 
 # Pydanticモデル定義
 class QuestionData(BaseModel):
@@ -73,6 +400,9 @@ class FileListItem(BaseModel):
     fileSize: int
     imageBase64: Optional[str] = None
 
+# 絵本データのバリデーション用アダプタ（リクエストごとに作成しないようモジュールで保持）
+STORYBOOK_ADAPTER = TypeAdapter(StorybookData)
+
 # ルートエンドポイント
 @app.get("/")
 async def root():
@@ -89,6 +419,33 @@ async def health_check():
     """
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+def persist_storybook(file_path: Path, storybook_data: StorybookData) -> int:
+    """
+    絵本データと画像・音声ファイル、サイドカーファイルを保存し、絵本のサイズを返す
+    サイズはJSONと各ページの画像・音声のバイト数の合計とする
+    （重複排除で共有しているファイルもページごとに数える）
+    """
+    # 画像・音声をバイナリファイルとして書き出し、JSONにはパスのみを保存
+    # （Base64文字列を含む辞書全体は作成しない）
+    page1_image = next((p.imageBase64 for p in storybook_data.pages if p.pageNumber == 1), None)
+    metadata = storybook_data.metadata.model_dump()
+    pages = []
+    asset_size = 0
+    for page in storybook_data.pages:
+        page_data, page_asset_size = export_page_assets(page)
+        pages.append(page_data)
+        asset_size += page_asset_size
+    
+    # ファイルに保存（JSON Lines形式）
+    payload = dumps_storybook_jsonl(metadata, pages)
+    write_bytes_atomic(file_path, payload)
+    file_size = len(payload) + asset_size
+    
+    # 一覧表示用のサイドカーファイルを保存
+    write_sidecar(file_path, metadata, page1_image, file_size)
+    
+    return file_size
+
 # JSON アップロードAPI
 @app.post("/api/upload-storybook")
 async def upload_storybook(storybook_data: StorybookData):
@@ -99,22 +456,14 @@ async def upload_storybook(storybook_data: StorybookData):
         # ファイル名を生成（タイトル + タイムスタンプ + UUID）
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         file_id = str(uuid.uuid4())[:8]
-        safe_title = "".join(c for c in storybook_data.metadata.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title.replace(' ', '_')
+        safe_title = TITLE_EXCLUDE_RE.sub('', storybook_data.metadata.title).rstrip().replace(' ', '_')
         filename = f"{safe_title}_{timestamp}_{file_id}.json"
         
         # ファイルパス
-        file_path = os.path.join(DATA_DIR, filename)
-        
-        # JSONデータを辞書に変換
-        json_data = storybook_data.model_dump()
-        
-        # ファイルに保存
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(json_data, f, ensure_ascii=False, indent=2)
+        file_path = DATA_DIR / filename
         
-        # ファイルサイズを取得
-        file_size = os.path.getsize(file_path)
+        # ファイル書き込みはイベントループを塞がないようスレッドで実行
+        file_size = await asyncio.to_thread(persist_storybook, file_path, storybook_data)
         
         logger.info(f"Storybook saved: {filename}, size: {file_size} bytes")
         
@@ -137,64 +486,202 @@ async def upload_storybook(storybook_data: StorybookData):
             detail=f"ファイルの保存中にエラーが発生しました: {str(e)}"
         )
 
-# ファイル一覧取得API
-@app.get("/api/storybooks", response_model=List[FileListItem])
-async def get_storybook_list():
+# 一覧APIのキャッシュ（ファイル名 -> (st_mtime_ns, st_size, 一覧項目)）
+_LIST_CACHE: Dict[str, Tuple[int, int, Optional[FileListItem]]] = {}
+_LIST_CACHE_LOCK = threading.Lock()
+
+def scan_list_fields(f) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
-    保存されている絵本ファイルの一覧を取得する
-    各絵本のメタデータ情報とページ1のimageBase64データを含む
+    JSONをストリーミングで走査し、メタデータとページ1のimageBase64のみを取り出す
+    必要な値が揃った時点で走査を打ち切る
+    """
+    metadata = None
+    metadata_done = False
+    page1_image = None
+    pages_done = False
+    page_number = None
+    page_fields = {}
+    
+    try:
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if prefix == 'metadata':
+                if event == 'start_map':
+                    metadata = {}
+                elif event == 'end_map':
+                    metadata_done = True
+            elif metadata is not None and not metadata_done and prefix.startswith('metadata.'):
+                # metadata直下のスカラー値のみを対象とする
+                key = prefix[len('metadata.'):]
+                if '.' not in key and event in ('string', 'number', 'boolean', 'null'):
+                    metadata[key] = value
+            elif not pages_done and prefix == 'pages.item':
+                if event == 'start_map':
+                    page_number = None
+                    page_fields = {}
+                elif event == 'end_map' and page_number == 1:
+                    page1_image = get_page_image(page_fields)
+                    pages_done = True
+            elif not pages_done and prefix == 'pages.item.pageNumber':
+                page_number = value
+            elif not pages_done and prefix in ('pages.item.imageBase64', 'pages.item.imagePath') and event == 'string':
+                page_fields[prefix[len('pages.item.'):]] = value
+            elif prefix == 'pages' and event == 'end_array':
+                pages_done = True
+            
+            if metadata_done and pages_done:
+                break
+    except ijson.JSONError as e:
+        raise ValueError(f"JSONデータが不正です: {str(e)}") from e
+    
+    return metadata, page1_image
+
+def scan_jsonl_list_fields(f) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """
+    JSON Lines形式のファイルを先頭から読み、メタデータとページ1のimageBase64のみを取り出す
+    ページ1の行を読んだ時点で打ち切る
+    """
+    metadata = loads_json(f.readline()).get('metadata')
+    for line in f:
+        if not line.strip():
+            continue
+        page = loads_json(line)
+        if isinstance(page, dict) and page.get('pageNumber') == 1:
+            return metadata, get_page_image(page)
+    return metadata, None
+
+def find_list_fields(data: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    読み込み済みのJSONデータからメタデータとページ1のimageBase64を取り出す
+    """
+    if 'metadata' not in data:
+        return None, None
+    
+    # ページ1のimageBase64を取得
+    page1_image = None
+    if 'pages' in data and isinstance(data['pages'], list):
+        # pageNumber=1のページを検索
+        for page in data['pages']:
+            if isinstance(page, dict) and page.get('pageNumber') == 1:
+                page1_image = get_page_image(page)
+                break
+    
+    return data['metadata'], page1_image
+
+def read_list_item(filename: str, file_path: Path, st: os.stat_result) -> Optional[FileListItem]:
+    """
+    絵本ファイルを読み込み、一覧表示用の項目を作成する
+    サイドカーファイルが最新であればそれを読み込み、なければ本体から作成する
+    メタデータが存在しない場合はNoneを返す
+    """
+    sidecar_path = get_sidecar_path(file_path)
     try:
-        file_list = []
+        sidecar_fresh = sidecar_path.stat().st_mtime_ns >= st.st_mtime_ns
+    except FileNotFoundError:
+        sidecar_fresh = False
+    
+    if sidecar_fresh:
+        sidecar = loads_json(sidecar_path.read_bytes())
+        metadata = sidecar.get('metadata')
+        page1_image = sidecar.get('page1_imageBase64')
+        file_size = sidecar.get('fileSize')
+    else:
+        file_size = None
+        
+        # メタデータとページ1の画像のみを取得（ijsonがない場合はファイル全体を読み込む）
+        with open(file_path, 'rb') as f:
+            is_jsonl = is_jsonl_storybook(f.read(len(JSONL_PREFIX)))
+            f.seek(0)
+            if is_jsonl:
+                metadata, page1_image = scan_jsonl_list_fields(f)
+            elif ijson is not None:
+                metadata, page1_image = scan_list_fields(f)
+            else:
+                metadata, page1_image = find_list_fields(loads_json(f.read()))
+        
+        # 旧形式のファイルにはサイドカーファイルを作成しておく
+        if metadata is not None:
+            try:
+                write_sidecar(file_path, metadata, page1_image)
+            except OSError as e:
+                logger.warning(f"Error writing sidecar for {filename}: {str(e)}")
+    
+    # メタデータが存在することを確認
+    if metadata is None:
+        logger.warning(f"File {filename} does not contain metadata")
+        return None
+    
+    return FileListItem(
+        filename=filename,
+        title=metadata.get('title', 'タイトル不明'),
+        createdAt=metadata.get('createdAt', ''),
+        totalPages=metadata.get('totalPages', 0),
+        savedPages=metadata.get('savedPages', 0),
+        # 画像・音声ファイルを含めたサイズが記録されていなければファイルサイズを使用
+        fileSize=file_size if file_size is not None else st.st_size,
+        imageBase64=page1_image
+    )
+
+def collect_list_items() -> List[FileListItem]:
+    """
+    dataディレクトリ内の絵本ファイルの一覧項目を作成する
+    更新日時とサイズが変わっていないファイルはキャッシュから返す
+    """
+    file_list = []
+    
+    with _LIST_CACHE_LOCK:
+        found = set()
         
         # dataディレクトリ内のJSONファイルを検索
-        if os.path.exists(DATA_DIR):
-            for filename in os.listdir(DATA_DIR):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(DATA_DIR, filename)
+        with os.scandir(DATA_DIR) as it:
+            for entry in it:
+                filename = entry.name
+                if not is_storybook_file(filename) or not entry.is_file():
+                    continue
+                
+                try:
+                    # 更新日時とファイルサイズを取得
+                    st = entry.stat()
+                    found.add(filename)
                     
-                    try:
-                        # ファイルサイズを取得
-                        file_size = os.path.getsize(file_path)
-                        
-                        # JSONファイルを読み込んでメタデータを取得
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
+                    # 変更されていなければキャッシュを使用
+                    cached = _LIST_CACHE.get(filename)
+                    if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+                        file_info = cached[2]
+                    else:
+                        file_info = read_list_item(filename, DATA_DIR / filename, st)
+                        _LIST_CACHE[filename] = (st.st_mtime_ns, st.st_size, file_info)
+                    
+                    if file_info is not None:
+                        file_list.append(file_info)
                         
-                        # メタデータが存在することを確認
-                        if 'metadata' in data:
-                            metadata = data['metadata']
-                            
-                            # ページ1のimageBase64を取得
-                            page1_image = None
-                            if 'pages' in data and isinstance(data['pages'], list):
-                                # pageNumber=1のページを検索
-                                for page in data['pages']:
-                                    if isinstance(page, dict) and page.get('pageNumber') == 1:
-                                        page1_image = page.get('imageBase64')
-                                        break
-                            
-                            file_info = FileListItem(
-                                filename=filename,
-                                title=metadata.get('title', 'タイトル不明'),
-                                createdAt=metadata.get('createdAt', ''),
-                                totalPages=metadata.get('totalPages', 0),
-                                savedPages=metadata.get('savedPages', 0),
-                                fileSize=file_size,
-                                imageBase64=page1_image
-                            )
-                            file_list.append(file_info)
-                        else:
-                            logger.warning(f"File {filename} does not contain metadata")
-                            
-                    except (json.JSONDecodeError, KeyError, ValueError) as e:
-                        logger.warning(f"Error reading file {filename}: {str(e)}")
-                        continue
+                except (OSError, json.JSONDecodeError, KeyError, ValueError) as e:
+                    logger.warning(f"Error reading file {filename}: {str(e)}")
+                    continue
         
-        # 作成日時でソート（新しい順）
-        file_list.sort(key=lambda x: x.createdAt, reverse=True)
+        # 削除されたファイルのキャッシュを破棄
+        for filename in _LIST_CACHE.keys() - found:
+            del _LIST_CACHE[filename]
+    
+    return file_list
+
+# ファイル一覧取得API
+@app.get("/api/storybooks", response_model=List[FileListItem])
+async def get_storybook_list(limit: Optional[int] = Query(None, ge=1)):
+    """
+    保存されている絵本ファイルの一覧を取得する
+    各絵本のメタデータ情報とページ1のimageBase64データを含む
+    limitを指定した場合は新しい順にlimit件のみを返す
+    """
+    try:
+        # ファイルの走査・読み込みはイベントループを塞がないようスレッドで実行
+        file_list = await asyncio.to_thread(collect_list_items)
         
         logger.info(f"Found {len(file_list)} storybook files")
+        
+        # 作成日時でソート（新しい順）。件数指定時は上位のみを取り出す
+        if limit is not None:
+            return heapq.nlargest(limit, file_list, key=operator.attrgetter('createdAt'))
+        file_list.sort(key=operator.attrgetter('createdAt'), reverse=True)
         return file_list
         
     except Exception as e:
@@ -204,74 +691,338 @@ async def get_storybook_list():
             detail=f"ファイル一覧の取得中にエラーが発生しました: {str(e)}"
         )
 
-# 個別絵本データ取得API
-@app.get("/api/storybook/{filename}", response_model=StorybookData)
-async def get_storybook_by_filename(filename: str):
+def resolve_storybook_path(filename: str) -> Tuple[str, Path]:
     """
-    指定されたファイル名の絵本データを取得する
+    ファイル名のセキュリティチェックを行い、(ファイル名, ファイルパス)を返す
+    """
+    # ファイル名のセキュリティチェック
+    # パストラバーサル攻撃防止のため、許可された文字のみで構成されているかチェック
+    if not FILENAME_RE.fullmatch(filename):
+        raise HTTPException(
+            status_code=400,
+            detail="無効なファイル名です"
+        )
+    
+    # .jsonで終わらない場合は追加
+    if not filename.endswith('.json'):
+        filename += '.json'
+    
+    # ファイルパスを構築
+    file_path = DATA_DIR / filename
+    
+    # ファイルの存在確認（サイドカーファイルは絵本データとして扱わない）
+    if not is_storybook_file(filename) or not file_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"指定されたファイル '{filename}' が見つかりません"
+        )
+    
+    # ファイルが実際にDATA_DIR内にあることを確認（シンボリックリンク対策）
+    if not os.path.realpath(file_path).startswith(_REAL_DATA_DIR + os.sep):
+        raise HTTPException(
+            status_code=400,
+            detail="無効なファイルパスです"
+        )
+    
+    return filename, file_path
+
+def parse_storybook(filename: str, raw: bytes) -> Dict[str, Any]:
+    """
+    保存されている絵本JSONを読み込み、データ構造を確認する
     """
     try:
-        # ファイル名のセキュリティチェック
-        # パストラバーサル攻撃防止のため、ファイル名に特定の文字が含まれていないかチェック
-        if '..' in filename or '/' in filename or '\\' in filename:
-            raise HTTPException(
-                status_code=400,
-                detail="無効なファイル名です"
-            )
+        data = loads_storybook(raw)
+    except json.JSONDecodeError as e:
+        logger.error(f"JSON decode error for file {filename}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"ファイルの読み込み中にエラーが発生しました: JSONデータが不正です"
+        )
+    
+    # データ構造の検証
+    if not isinstance(data, dict) or 'metadata' not in data or 'pages' not in data:
+        raise HTTPException(
+            status_code=500,
+            detail="ファイルのデータ形式が不正です"
+        )
+    
+    return data
+
+def has_asset_refs(raw: bytes) -> bool:
+    """
+    画像・音声がファイルに書き出されている（パス参照を含む）かどうかを判定する
+    """
+    return any(f'"{path_field}"'.encode('ascii') in raw for _, path_field in ASSET_FIELDS)
+
+def can_serve_raw(raw: bytes) -> bool:
+    """
+    保存ファイルをそのままレスポンスとして返せるかどうかを判定する
+    （旧形式のJSONで、画像・音声がBase64のまま埋め込まれている場合のみ）
+    """
+    return not is_jsonl_storybook(raw) and not has_asset_refs(raw)
+
+# 個別取得APIのレスポンスキャッシュ（(ファイル名, st_mtime_ns, inline_assets) -> JSONバイト列）
+# 合計サイズの上限はプロセスごと。環境変数 BYTES_CACHE_MAX_BYTES で変更可能
+BYTES_CACHE_MAX_ENTRIES = 128
+BYTES_CACHE_MAX_BYTES = int(os.environ.get("BYTES_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+_BYTES_CACHE: "OrderedDict[Tuple[str, int, bool], bytes]" = OrderedDict()
+_BYTES_CACHE_SIZE = 0
+_BYTES_CACHE_LOCK = threading.Lock()
+
+def get_cached_bytes(key: Tuple[str, int, bool]) -> Optional[bytes]:
+    """
+    キャッシュ済みのレスポンスを取得する（最近使用したものとして更新）
+    """
+    with _BYTES_CACHE_LOCK:
+        content = _BYTES_CACHE.get(key)
+        if content is not None:
+            _BYTES_CACHE.move_to_end(key)
+        return content
+
+def put_cached_bytes(key: Tuple[str, int, bool], content: bytes) -> None:
+    """
+    レスポンスをキャッシュに追加し、上限を超えた分を古い順に破棄する
+    """
+    global _BYTES_CACHE_SIZE
+    if len(content) > BYTES_CACHE_MAX_BYTES:
+        return
+    
+    with _BYTES_CACHE_LOCK:
+        # 同じファイルの古い更新日時のエントリを破棄
+        for stale_key in [k for k in _BYTES_CACHE if k[0] == key[0] and k[2] == key[2]]:
+            _BYTES_CACHE_SIZE -= len(_BYTES_CACHE.pop(stale_key))
         
-        # .jsonで終わらない場合は追加
-        if not filename.endswith('.json'):
-            filename += '.json'
+        _BYTES_CACHE[key] = content
+        _BYTES_CACHE_SIZE += len(content)
         
-        # ファイルパスを構築
-        file_path = os.path.join(DATA_DIR, filename)
+        while len(_BYTES_CACHE) > BYTES_CACHE_MAX_ENTRIES or _BYTES_CACHE_SIZE > BYTES_CACHE_MAX_BYTES:
+            _, evicted = _BYTES_CACHE.popitem(last=False)
+            _BYTES_CACHE_SIZE -= len(evicted)
+
+def load_storybook_bytes(filename: str, file_path: Path, inline_assets: bool) -> bytes:
+    """
+    レスポンスとして返す絵本JSONのバイト列を取得する
+    同じ更新日時のファイルはキャッシュから返す
+    """
+    cache_key = (filename, file_path.stat().st_mtime_ns, inline_assets)
+    content = get_cached_bytes(cache_key)
+    if content is not None:
+        return content
+    
+    content = file_path.read_bytes()
+    
+    # 旧形式でパス参照を含まないファイルはそのまま返す
+    if not can_serve_raw(content):
+        data = parse_storybook(filename, content)
         
-        # ファイルの存在確認
-        if not os.path.exists(file_path):
-            raise HTTPException(
-                status_code=404,
-                detail=f"指定されたファイル '{filename}' が見つかりません"
-            )
+        # 書き出されている画像・音声をBase64文字列に戻す
+        if inline_assets:
+            inline_storybook_assets(data)
         
-        # ファイルが実際にDATA_DIR内にあることを確認（セキュリティ対策）
-        real_file_path = os.path.realpath(file_path)
-        real_data_dir = os.path.realpath(DATA_DIR)
-        if not real_file_path.startswith(real_data_dir):
+        content = dumps_json(data, indent=False)
+    
+    put_cached_bytes(cache_key, content)
+    return content
+
+def dump_validated_storybook(file_path: Path) -> bytes:
+    """
+    絵本JSONを読み込み、StorybookDataとしてバリデーションした結果をJSONバイト列で返す
+    別プロセスで実行するため、エラーはpickle可能なValueErrorとして送出する
+    """
+    raw = file_path.read_bytes()
+    
+    # PydanticモデルでバリデーションしながらStorybookDataに変換
+    try:
+        # 旧形式でパス参照を含まないファイルはJSONから直接変換する
+        if can_serve_raw(raw):
+            storybook_data = STORYBOOK_ADAPTER.validate_json(raw)
+        else:
+            data = loads_storybook(raw)
+            
+            # 書き出されている画像・音声をBase64文字列に戻す
+            inline_storybook_assets(data)
+            
+            storybook_data = STORYBOOK_ADAPTER.validate_python(data)
+    except ValueError as e:
+        # ValidationErrorとJSONDecodeErrorはいずれもValueErrorのサブクラス
+        raise ValueError(str(e)) from None
+    
+    return STORYBOOK_ADAPTER.dump_json(storybook_data)
+
+def parse_fields_param(fields: str) -> Set[Tuple[str, ...]]:
+    """
+    fieldsクエリパラメータ（例: "metadata,pages.text"）をドット区切りのパスの集合に変換する
+    """
+    paths = set()
+    for field in fields.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        path = tuple(field.split('.'))
+        if not all(path):
             raise HTTPException(
                 status_code=400,
-                detail="無効なファイルパスです"
+                detail=f"無効なfieldsパラメータです: {field}"
             )
+        paths.add(path)
+    return paths
+
+def is_selected_path(path: Tuple[str, ...], paths: Set[Tuple[str, ...]]) -> bool:
+    """
+    指定されたパス自体、またはその配下にあるかどうかを判定する
+    """
+    return any(path[:len(selected)] == selected for selected in paths)
+
+def is_relevant_path(path: Tuple[str, ...], paths: Set[Tuple[str, ...]]) -> bool:
+    """
+    指定されたパスの経路上、またはその配下にあるかどうかを判定する
+    """
+    return any(path[:len(selected)] == selected or selected[:len(path)] == path for selected in paths)
+
+def project_value(value: Any, paths: Set[Tuple[str, ...]], path: Tuple[str, ...] = ()) -> Any:
+    """
+    読み込み済みのデータから指定されたパスの値のみを取り出す（配列の要素は全て対象とする）
+    """
+    if is_selected_path(path, paths):
+        return value
+    if isinstance(value, list):
+        return [project_value(item, paths, path) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: project_value(item, paths, path + (key,))
+            for key, item in value.items()
+            if is_relevant_path(path + (key,), paths)
+        }
+    return value
+
+def project_json_stream(f, paths: Set[Tuple[str, ...]]) -> Any:
+    """
+    JSONをストリーミングで走査し、指定されたパスの値のみを組み立てる
+    指定されていない値（Base64文字列など）は辞書に格納しない
+    """
+    builder = ijson.ObjectBuilder()
+    # 現在の値のパス（配列はパスに含めない）
+    path: List[str] = []
+    # 開いているオブジェクト・配列ごとに、pathにキーを追加しているかどうか
+    key_pushed: List[bool] = []
+    try:
+        for event, value in ijson.basic_parse(f, use_float=True):
+            if event == 'map_key':
+                if key_pushed[-1]:
+                    path.pop()
+                path.append(value)
+                key_pushed[-1] = True
+            elif event in ('end_map', 'end_array'):
+                if key_pushed.pop():
+                    path.pop()
+            
+            if is_relevant_path(tuple(path), paths):
+                builder.event(event, value)
+            
+            if event in ('start_map', 'start_array'):
+                key_pushed.append(False)
+    except ijson.JSONError as e:
+        raise ValueError(f"JSONデータが不正です: {str(e)}") from e
+    return builder.value
+
+def load_projected_storybook(filename: str, file_path: Path, paths: Set[Tuple[str, ...]], inline_assets: bool) -> bytes:
+    """
+    絵本データのうち指定されたフィールドのみを取り出し、JSONバイト列で返す
+    """
+    # 画像・音声のBase64が指定された場合は、パス参照も合わせて読み込む
+    # （パス参照自体が指定された場合は、Base64に戻さずそのまま返す）
+    read_paths = set(paths)
+    inline_fields = set()
+    for base64_field, path_field in ASSET_FIELDS:
+        if ('pages',) in paths or ('pages', base64_field) in paths:
+            read_paths.add(('pages', path_field))
+            if ('pages', path_field) not in paths:
+                inline_fields.add(base64_field)
+    
+    try:
+        with open(file_path, 'rb') as f:
+            is_jsonl = is_jsonl_storybook(f.read(len(JSONL_PREFIX)))
+            f.seek(0)
+            if is_jsonl:
+                # ページが指定されていなければヘッダー行のみを読み込む
+                if any(path[0] == 'pages' for path in read_paths):
+                    data = loads_storybook(f.read())
+                else:
+                    data = {"metadata": loads_json(f.readline()).get('metadata')}
+                data = project_value(data, read_paths)
+            elif ijson is not None:
+                data = project_json_stream(f, read_paths)
+            else:
+                data = project_value(loads_json(f.read()), read_paths)
+    except ValueError as e:
+        logger.error(f"JSON decode error for file {filename}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"ファイルの読み込み中にエラーが発生しました: JSONデータが不正です"
+        )
+    
+    # パス参照になっている画像・音声をBase64文字列に戻す
+    if inline_assets:
+        inline_storybook_assets(data, inline_fields)
+    
+    return dumps_json(data, indent=False)
+
+# 個別絵本データ取得API
+@app.get("/api/storybook/{filename}")
+async def get_storybook_by_filename(filename: str, inline_assets: bool = True, fields: Optional[str] = None):
+    """
+    指定されたファイル名の絵本データを取得する
+    アップロード時にバリデーション済みのため、Pydanticモデルへの変換は行わない
+    同じ更新日時のファイルはキャッシュしたレスポンスを返す
+    inline_assets=falseの場合、画像・音声はBase64に戻さず /api/asset/ 以下のパスのまま返す
+    fieldsを指定した場合（例: fields=metadata,pages.text）、指定されたフィールドのみを返す
+    """
+    try:
+        filename, file_path = resolve_storybook_path(filename)
+        paths = parse_fields_param(fields) if fields else None
         
-        # JSONファイルを読み込み
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error for file {filename}: {str(e)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"ファイルの読み込み中にエラーが発生しました: JSONデータが不正です"
-            )
+        # ファイル読み込みはイベントループを塞がないようスレッドで実行
+        if paths:
+            content = await asyncio.to_thread(load_projected_storybook, filename, file_path, paths, inline_assets)
+        else:
+            content = await asyncio.to_thread(load_storybook_bytes, filename, file_path, inline_assets)
         
-        # データ構造の検証
-        if 'metadata' not in data or 'pages' not in data:
-            raise HTTPException(
-                status_code=500,
-                detail="ファイルのデータ形式が不正です"
-            )
+        logger.info(f"Successfully retrieved storybook: {filename}")
+        return Response(content=content, media_type="application/json")
+        
+    except HTTPException:
+        # HTTPExceptionはそのまま再発生させる
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error getting storybook {filename}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"絵本データの取得中に予期しないエラーが発生しました: {str(e)}"
+        )
+
+# 個別絵本データ取得API（バリデーションあり）
+@app.get("/api/storybook/{filename}/validated", response_model=StorybookData)
+async def get_validated_storybook_by_filename(filename: str):
+    """
+    指定されたファイル名の絵本データをPydanticモデルでバリデーションして取得する
+    """
+    try:
+        filename, file_path = resolve_storybook_path(filename)
         
-        # PydanticモデルでバリデーションしながらStorybookDataに変換
+        # JSONの解析とバリデーションはCPU負荷が高いため別プロセスで実行
         try:
-            storybook_data = StorybookData(**data)
-        except Exception as e:
+            content = await asyncio.get_running_loop().run_in_executor(
+                _PROCESS_POOL, dump_validated_storybook, file_path
+            )
+        except ValueError as e:
             logger.error(f"Data validation error for file {filename}: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"データのバリデーション中にエラーが発生しました: {str(e)}"
             )
         
-        logger.info(f"Successfully retrieved storybook: {filename}")
-        return storybook_data
+        logger.info(f"Successfully retrieved validated storybook: {filename}")
+        return Response(content=content, media_type="application/json")
         
     except HTTPException:
         # HTTPExceptionはそのまま再発生させる